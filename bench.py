@@ -0,0 +1,419 @@
+"""Benchmark harness for the Student Result Management System.
+
+Seeds a fresh database.db in a scratch directory with synthetic users,
+results and subjects, then drives the real routes either in-process
+through the Flask test client or over HTTP against a local gunicorn.
+Latency percentiles, requests per second and peak RSS are written as JSON
+so runs can be compared between commits:
+
+    python bench.py --users 1000 --results 10000 --subjects 8 -o before.json
+    python bench.py --mode gunicorn --workers 4 --concurrency 16 -o after.json
+    python bench.py --compare before.json after.json
+
+The working directory (and so the real database.db and uploads) is never
+touched; pass --workdir to keep and reuse a seeded database.
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+REPO = os.path.dirname(os.path.abspath(__file__))
+PASSWORD = 'bench-password'
+BOARDS = ['CBSE', 'ICSE', 'State Board', 'IB']
+EXAMS = ['Mid Term', 'Final', 'Pre Board', 'Unit Test']
+SCHOOLS = ['Greenwood High', 'St. Xavier', 'Delhi Public School', 'Modern School', 'Little Flower']
+SUBJECTS = ['Maths', 'Science', 'English', 'Hindi', 'Social Studies', 'Computer',
+            'Physics', 'Chemistry', 'Biology', 'Economics']
+FIRST_NAMES = ['Aarav', 'Vivaan', 'Aditya', 'Diya', 'Ananya', 'Ishaan', 'Saanvi', 'Kabir',
+               'Meera', 'Rohan', 'Priya', 'Arjun', 'Nisha', 'Karan', 'Tara']
+LAST_NAMES = ['Sharma', 'Verma', 'Gupta', 'Iyer', 'Khan', 'Das', 'Patel', 'Reddy', 'Singh']
+
+# Scenarios, in the order they are run and reported
+SCENARIOS = ['login', 'dashboard', 'dashboard_search', 'dashboard_sort_asc', 'view',
+             'add', 'edit', 'export_csv']
+
+# ------------------------------------------------------------
+# SEEDING
+# ------------------------------------------------------------
+def seed(workdir, users, results, subjects, rng):
+    """Create database.db in workdir through the app's migrations and fill it."""
+    env = dict(os.environ, SECRET_KEY='bench', PYTHONPATH=REPO)
+    # importing the app in workdir runs init_db() there; it also reports the
+    # grade thresholds, so seeded grades are the ones calculate_grade() gives
+    out = subprocess.run(
+        [sys.executable, '-c',
+         'import json, app; print(json.dumps([app.GRADE_THRESHOLDS, app.FAIL_GRADE]))'],
+        cwd=workdir, env=env, check=True, stdout=subprocess.PIPE, text=True).stdout
+    thresholds, fail_grade = json.loads(out.splitlines()[-1])
+
+    from werkzeug.security import generate_password_hash
+    method = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    password_hash = generate_password_hash(PASSWORD, method=method)
+
+    db = sqlite3.connect(os.path.join(workdir, 'database.db'))
+    db.execute('PRAGMA synchronous = OFF')
+    with db:
+        db.executemany('INSERT INTO users (name, email, password_hash) VALUES (?, ?, ?)',
+                       [(f'Bench User {i}', f'user{i}@bench.local', password_hash)
+                        for i in range(users)])
+        user_ids = [row[0] for row in db.execute('SELECT id FROM users ORDER BY id')]
+        for start in range(0, results, 1000):
+            result_rows, subject_rows = [], []
+            for _ in range(start, min(start + 1000, results)):
+                marks = [(name, rng.randint(20, 100), 100)
+                         for name in rng.sample(SUBJECTS, min(subjects, len(SUBJECTS)))]
+                obtained = sum(m[1] for m in marks)
+                total = sum(m[2] for m in marks) or 1
+                percentage = obtained / total * 100
+                result_rows.append((
+                    rng.choice(user_ids),
+                    f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                    rng.choice(BOARDS), rng.choice(EXAMS), rng.choice(SCHOOLS),
+                    str(rng.randint(6, 12)), rng.randint(2018, 2025),
+                    obtained, total, percentage,
+                    grade_for(percentage, thresholds, fail_grade)))
+                subject_rows.append(marks)
+            first_id = (db.execute('SELECT COALESCE(MAX(id), 0) FROM results').fetchone()[0]) + 1
+            db.executemany('''
+                INSERT INTO results (user_id, student_name, board, exam, school, class_name,
+                                     year, total_obtained, total_marks, percentage, grade)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', result_rows)
+            db.executemany(
+                'INSERT INTO subjects (result_id, subject_name, obtained, total) VALUES (?, ?, ?, ?)',
+                [(first_id + i, *mark) for i, marks in enumerate(subject_rows) for mark in marks])
+    db.execute('ANALYZE')
+    db.close()
+
+def grade_for(percentage, thresholds, fail_grade):
+    """app.calculate_grade() over thresholds read from the app."""
+    for threshold, grade in thresholds:
+        if percentage >= threshold:
+            return grade
+    return fail_grade
+
+def load_fixture(workdir, sessions, rng):
+    """Pick `sessions` users that own results, with their result ids."""
+    db = sqlite3.connect(os.path.join(workdir, 'database.db'))
+    rows = db.execute('''
+        SELECT u.id, u.email, GROUP_CONCAT(r.id) FROM users u JOIN results r ON r.user_id = u.id
+        GROUP BY u.id ORDER BY u.id
+    ''').fetchall()
+    db.close()
+    if not rows:
+        raise SystemExit('The seeded database has no results.')
+    chosen = rng.sample(rows, min(sessions, len(rows)))
+    return [{'email': email, 'result_ids': [int(i) for i in ids.split(',')]}
+            for _, email, ids in chosen]
+
+def result_form(rng, subjects):
+    names = rng.sample(SUBJECTS, min(subjects, len(SUBJECTS)))
+    return {
+        'student_name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+        'board': rng.choice(BOARDS), 'exam': rng.choice(EXAMS), 'school': rng.choice(SCHOOLS),
+        'class_name': str(rng.randint(6, 12)), 'year': str(rng.randint(2018, 2025)),
+        'subject_name[]': names,
+        'obtained[]': [str(rng.randint(20, 100)) for _ in names],
+        'total[]': ['100'] * len(names),
+    }
+
+def request_for(scenario, user, rng, subjects):
+    """(method, path, form data) for one request of a scenario."""
+    if scenario == 'login':
+        return 'POST', '/login', {'email': user['email'], 'password': PASSWORD}
+    if scenario == 'dashboard':
+        return 'GET', '/dashboard', None
+    if scenario == 'dashboard_search':
+        term = rng.choice(FIRST_NAMES + SCHOOLS).split()[0][:4]
+        return 'GET', '/dashboard?' + urllib.parse.urlencode({'search': term}), None
+    if scenario == 'dashboard_sort_asc':
+        return 'GET', '/dashboard?sort=asc', None
+    if scenario == 'view':
+        return 'GET', f"/view/{rng.choice(user['result_ids'])}", None
+    if scenario == 'add':
+        return 'POST', '/add', result_form(rng, subjects)
+    if scenario == 'edit':
+        return 'POST', f"/edit/{rng.choice(user['result_ids'])}", result_form(rng, subjects)
+    if scenario == 'export_csv':
+        return 'GET', '/export/csv', None
+    raise ValueError(scenario)
+
+# ------------------------------------------------------------
+# DRIVERS
+# ------------------------------------------------------------
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+
+    def pct(p):
+        if not latencies:
+            return None
+        rank = (len(latencies) - 1) * p / 100
+        low = int(rank)
+        high = min(low + 1, len(latencies) - 1)
+        return round((latencies[low] + (latencies[high] - latencies[low]) * (rank - low)) * 1000, 3)
+
+    return {
+        'requests': len(latencies), 'errors': errors,
+        'p50_ms': pct(50), 'p95_ms': pct(95), 'p99_ms': pct(99),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else None,
+        'rps': round(len(latencies) / elapsed, 2) if elapsed else None,
+    }
+
+def run_test_client(args, workdir, fixture, rng):
+    """Drive the app in this process, one request at a time."""
+    os.chdir(workdir)
+    sys.path.insert(0, REPO)
+    os.environ.setdefault('SECRET_KEY', 'bench')
+    import app as app_module
+
+    clients = []
+    for user in fixture:
+        client = app_module.app.test_client()
+        client.post('/login', data={'email': user['email'], 'password': PASSWORD})
+        clients.append((client, user))
+
+    report = {}
+    for scenario in args.scenarios:
+        latencies, errors = [], 0
+        started = time.perf_counter()
+        for i in range(args.requests):
+            client, user = clients[i % len(clients)]
+            if scenario == 'login':
+                client = app_module.app.test_client()
+            method, path, data = request_for(scenario, user, rng, args.subjects)
+            t0 = time.perf_counter()
+            response = client.open(path, method=method, data=data)
+            response.get_data()  # drains streamed responses such as the export
+            latencies.append(time.perf_counter() - t0)
+            if response.status_code >= 400:
+                errors += 1
+        report[scenario] = summarize(latencies, errors, time.perf_counter() - started)
+        print(f"{scenario:>20}: {report[scenario]}", file=sys.stderr)
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return report, round(peak_rss_kb / 1024, 1)
+
+class HttpSession:
+    """A logged-in HTTP client with its own cookie jar; redirects are not followed."""
+
+    class _NoRedirect(urllib.request.HTTPRedirectHandler):
+        def redirect_request(self, *args, **kwargs):
+            return None
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), self._NoRedirect())
+
+    def open(self, method, path, data=None):
+        body = urllib.parse.urlencode(data, doseq=True).encode() if data is not None else None
+        request = urllib.request.Request(self.base_url + path, data=body, method=method)
+        try:
+            with self.opener.open(request, timeout=60) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code
+
+def process_tree_rss_kb(pid):
+    """Current RSS of a process and all its descendants, from /proc."""
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f'/proc/{current}/status') as status:
+                for line in status:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1])
+            with open(f'/proc/{current}/task/{current}/children') as children:
+                pending.extend(int(child) for child in children.read().split())
+        except (FileNotFoundError, ProcessLookupError):
+            continue
+    return total
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def run_gunicorn(args, workdir, fixture, rng):
+    """Drive a local gunicorn over HTTP with --concurrency client threads."""
+    port = free_port()
+    env = dict(os.environ, SECRET_KEY='bench', PYTHONPATH=REPO)
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--workers', str(args.workers),
+         '--threads', str(args.threads), '--bind', f'127.0.0.1:{port}', 'app:app'],
+        cwd=workdir, env=env)
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                urllib.request.urlopen(base_url + '/login', timeout=1).read()
+                break
+            except OSError:
+                if time.monotonic() > deadline or server.poll() is not None:
+                    raise SystemExit('gunicorn did not start')
+                time.sleep(0.2)
+
+        peak = [0]
+        sampling = threading.Event()
+
+        def sample():
+            while not sampling.wait(0.1):
+                peak[0] = max(peak[0], process_tree_rss_kb(server.pid))
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+
+        sessions = []
+        for user in fixture:
+            session = HttpSession(base_url)
+            session.open('POST', '/login', {'email': user['email'], 'password': PASSWORD})
+            sessions.append((session, user))
+
+        report = {}
+        lock = threading.Lock()
+        for scenario in args.scenarios:
+            plans = []
+            for i in range(args.requests):
+                session, user = sessions[i % len(sessions)]
+                if scenario == 'login':
+                    session = HttpSession(base_url)
+                plans.append((session, request_for(scenario, user, rng, args.subjects)))
+            latencies, errors = [], [0]
+
+            def fire(plan):
+                session, (method, path, data) = plan
+                t0 = time.perf_counter()
+                status = session.open(method, path, data)
+                elapsed = time.perf_counter() - t0
+                with lock:
+                    latencies.append(elapsed)
+                    if status >= 400:
+                        errors[0] += 1
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                list(pool.map(fire, plans))
+            report[scenario] = summarize(latencies, errors[0], time.perf_counter() - started)
+            print(f"{scenario:>20}: {report[scenario]}", file=sys.stderr)
+        sampling.set()
+        sampler.join()
+        return report, round(peak[0] / 1024, 1)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+# ------------------------------------------------------------
+# REPORTING
+# ------------------------------------------------------------
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(old_path, new_path):
+    """Print per-scenario changes between two benchmark JSON files."""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{old['meta'].get('commit')} -> {new['meta'].get('commit')}")
+    for scenario, after in new['scenarios'].items():
+        before = old['scenarios'].get(scenario)
+        if not before:
+            continue
+        changes = []
+        for metric in ('p50_ms', 'p95_ms', 'p99_ms', 'rps'):
+            if before.get(metric) and after.get(metric) is not None:
+                delta = (after[metric] - before[metric]) / before[metric] * 100
+                changes.append(f'{metric} {before[metric]} -> {after[metric]} ({delta:+.1f}%)')
+        print(f'{scenario:>20}: ' + ', '.join(changes))
+    print(f"{'peak_rss_mb':>20}: {old.get('peak_rss_mb')} -> {new.get('peak_rss_mb')}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--mode', choices=['test-client', 'gunicorn'], default='test-client')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--results', type=int, default=10000, help='results in total')
+    parser.add_argument('--subjects', type=int, default=8, help='subjects per result')
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario')
+    parser.add_argument('--sessions', type=int, default=10, help='logged-in users to spread load over')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f"comma separated, from {','.join(SCENARIOS)}")
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers')
+    parser.add_argument('--threads', type=int, default=4, help='gunicorn threads per worker')
+    parser.add_argument('--concurrency', type=int, default=8, help='client threads (gunicorn mode)')
+    parser.add_argument('--workdir', help='reuse/keep this directory instead of a temporary one')
+    parser.add_argument('--seed', type=int, default=42, help='random seed')
+    parser.add_argument('-o', '--output', help='write the JSON report here (default: stdout)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'),
+                        help='compare two reports and exit')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    args.scenarios = [s for s in args.scenarios.split(',') if s]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    # measure the app, not the limiter: every bench request comes from one IP
+    os.environ['RATE_LIMIT_ENABLED'] = '0'
+    rng = random.Random(args.seed)
+    workdir = args.workdir or tempfile.mkdtemp(prefix='srms-bench-')
+    os.makedirs(workdir, exist_ok=True)
+    try:
+        if not os.path.exists(os.path.join(workdir, 'database.db')):
+            started = time.perf_counter()
+            seed(workdir, args.users, args.results, args.subjects, rng)
+            print(f'Seeded {args.users} users, {args.results} results x {args.subjects} subjects '
+                  f'in {time.perf_counter() - started:.1f}s', file=sys.stderr)
+        fixture = load_fixture(workdir, args.sessions, rng)
+        runner = run_gunicorn if args.mode == 'gunicorn' else run_test_client
+        scenarios, peak_rss_mb = runner(args, workdir, fixture, rng)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'commit': git_commit(), 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(), 'sqlite': sqlite3.sqlite_version,
+            'mode': args.mode, 'users': args.users, 'results': args.results,
+            'subjects': args.subjects, 'requests': args.requests, 'sessions': args.sessions,
+            'workers': args.workers, 'threads': args.threads, 'concurrency': args.concurrency,
+            'seed': args.seed,
+        },
+        'scenarios': scenarios,
+        'peak_rss_mb': peak_rss_mb,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Shared fixtures. The app runs in a throw-away directory with its own
+database.db; set DATABASE_URL to a PostgreSQL database (see
+docker-compose.yml) to run the suite against PostgreSQL instead.
+"""
+import itertools
+import os
+import sys
+import tempfile
+
+import pytest
+
+os.chdir(tempfile.mkdtemp(prefix='results-tests-'))
+os.environ.setdefault('SECRET_KEY', 'test')
+# no background threads: tests drive the job queue themselves
+os.environ.update(JOB_WORKERS='0', HASH_WORKERS='0', RATE_LIMIT_ENABLED='0',
+                  PASSWORD_HASH_METHOD='pbkdf2:sha256:1000')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as results_app  # noqa: E402
+
+_emails = itertools.count()
+
+@pytest.fixture
+def app_module():
+    return results_app
+
+@pytest.fixture
+def db():
+    """A pooled connection, rolled back and returned after the test."""
+    conn = results_app.db_pool.acquire()
+    yield conn
+    conn.rollback()
+    results_app.db_pool.release(conn)
+
+@pytest.fixture
+def make_user(db):
+    """Create a user with a unique email and return its id."""
+    def make(name='Test'):
+        email = f'user{os.getpid()}-{next(_emails)}@example.com'
+        cursor = db.execute('INSERT INTO users (name, email, password_hash) VALUES (?, ?, ?)',
+                            (name, email, results_app.hash_password('pw123456')))
+        db.commit()
+        return cursor.lastrowid
+    return make
+
+@pytest.fixture
+def client(db):
+    """A test client logged in as a new user, whose id is client.user_id."""
+    client = results_app.app.test_client()
+    email = f'client{os.getpid()}-{next(_emails)}@example.com'
+    client.post('/register', data=dict(name='Test', email=email, password='pw123456',
+                                       confirm_password='pw123456'))
+    client.post('/login', data=dict(email=email, password='pw123456'))
+    client.user_id = db.execute('SELECT id FROM users WHERE email = ?', (email,)).fetchone()[0]
+    db.commit()
+    return client
+
+def run_queued_jobs(db):
+    """Run every due job on the queue, as a worker would."""
+    while (job := results_app.claim_job(db, 'tests')) is not None:
+        results_app.run_job(db, job)
+
+def result_fields(name='Student', year=2024):
+    return dict(student_name=name, board='CBSE', exam='Final', school='S',
+                class_name='10', year=year)
+
+def add_result(db, user_id, name='Student', obtained=60, total=100, year=2024):
+    """Save a two-subject result for `user_id` and return its id."""
+    subjects = [('Maths', obtained, total), ('Science', obtained, total)]
+    return results_app.save_result(db, user_id, result_fields(name, year), subjects)
@@ -0,0 +1,77 @@
+"""Year archives: archive, read through the fallback, restore."""
+import itertools
+import os
+
+import pytest
+
+from conftest import add_result, results_app
+
+pytestmark = pytest.mark.skipif(results_app.db_backend.name != 'sqlite',
+                                reason='year archives are SQLite files')
+
+_years = itertools.count(1990)  # years no other test writes results for
+
+@pytest.fixture
+def archived_year(db):
+    """A year of its own for the test; restored if the test left it archived."""
+    year = next(_years)
+    yield year
+    if os.path.exists(results_app.archive_path(year)):
+        results_app.restore_year(db, year)
+
+def counts(db, user_id):
+    results = db.execute('SELECT COUNT(*) FROM results WHERE user_id = ?', (user_id,)).fetchone()[0]
+    subjects = db.execute('SELECT COUNT(*) FROM subjects JOIN results ON results.id = result_id '
+                          'WHERE user_id = ?', (user_id,)).fetchone()[0]
+    db.commit()
+    return results, subjects
+
+def stats(db, user_id, archived=False):
+    if archived:
+        results_app.attach_archives(db)
+    try:
+        return results_app.get_user_stats(db, user_id, archived)
+    finally:
+        db.commit()
+        if archived:
+            results_app.detach_archives(db)
+
+def test_an_archived_year_round_trips(db, client, archived_year):
+    user_id = client.user_id
+    old = [add_result(db, user_id, 'Old A', 50, year=archived_year),
+           add_result(db, user_id, 'Old B', 90, year=archived_year)]
+    add_result(db, user_id, 'Current', 70)
+    before = stats(db, user_id)
+    assert before['count'] == 3 and counts(db, user_id) == (3, 6)
+
+    assert results_app.archive_year(db, archived_year) == 2
+    assert counts(db, user_id) == (1, 2)
+    live = stats(db, user_id)
+    assert live['count'] == 1 and live['average'] == 70 and live['highest'] == 70
+    assert stats(db, user_id, archived=True) == before
+
+    page = client.get(f'/view/{old[1]}')
+    assert page.status_code == 200
+    html = page.get_data(as_text=True)
+    assert 'Old B' in html and 'Archived' in html and f'/edit/{old[1]}' not in html
+
+    assert results_app.restore_year(db, archived_year) == 2
+    assert not os.path.exists(results_app.archive_path(archived_year))
+    assert counts(db, user_id) == (3, 6)
+    assert stats(db, user_id) == before
+    html = client.get(f'/view/{old[1]}').get_data(as_text=True)
+    assert f'/edit/{old[1]}' in html
+
+def test_archiving_again_adds_to_the_archive(db, make_user, archived_year):
+    user_id = make_user()
+    add_result(db, user_id, 'First', 60, year=archived_year)
+    assert results_app.archive_year(db, archived_year) == 1
+    add_result(db, user_id, 'Late', 80, year=archived_year)
+    assert results_app.archive_year(db, archived_year) == 1
+    assert counts(db, user_id) == (0, 0)
+    assert stats(db, user_id, archived=True)['count'] == 2
+
+    assert results_app.restore_year(db, archived_year) == 2
+    assert counts(db, user_id) == (2, 4)
+    restored = stats(db, user_id)
+    assert restored['count'] == 2 and restored['average'] == 70 and restored['highest'] == 80
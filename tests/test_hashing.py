@@ -0,0 +1,40 @@
+"""Password hashing pool: bounded queue and cancellation."""
+import threading
+import time
+
+import pytest
+
+from conftest import results_app
+
+@pytest.fixture
+def hash_pool(monkeypatch):
+    monkeypatch.setattr(results_app, 'HASH_WORKERS', 1)
+    monkeypatch.setattr(results_app, 'HASH_TIMEOUT', 0.3)
+    monkeypatch.setattr(results_app, '_hash_slots', threading.BoundedSemaphore(2))
+    monkeypatch.setattr(results_app, '_hash_executor', None)
+    yield
+    results_app._hash_executor.shutdown(cancel_futures=True)
+
+def test_refused_callers_leave_no_work_beyond_the_queue_size(hash_pool):
+    refused = []
+
+    def call():
+        try:
+            results_app.run_kdf(time.sleep, 1)
+        except results_app.HashBusy:
+            refused.append(True)
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert len(refused) == 4
+    # the slots stay taken while submitted work is still running
+    assert not results_app._hash_slots.acquire(blocking=False)
+
+    deadline = time.monotonic() + 5
+    while results_app._hash_slots._value < 2 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert results_app._hash_slots._value == 2
+    assert results_app.run_kdf(len, 'abc') == 3
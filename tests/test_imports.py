@@ -0,0 +1,147 @@
+"""Bulk imports: grouping, row errors, resuming and claiming."""
+import io
+import os
+
+import pytest
+
+from conftest import results_app, run_queued_jobs
+
+HEADER = 'Student Name,Board,Exam,School,Class,Year,Subject,Obtained,Total\n'
+
+def write_import(tmp_path, rows):
+    path = tmp_path / 'import.csv'
+    path.write_text(HEADER + ''.join(f'{row}\n' for row in rows))
+    return str(path)
+
+def student_rows(count):
+    return [f'Student {i},CBSE,Final,S,10,2024,{subject},{60 + i},100'
+            for i in range(count) for subject in ('Maths', 'Science')]
+
+def import_row(db, import_id):
+    row = db.execute('SELECT * FROM imports WHERE id = ?', (import_id,)).fetchone()
+    db.commit()
+    return row
+
+def result_count(db, user_id):
+    count = db.execute('SELECT COUNT(*) FROM results WHERE user_id = ?', (user_id,)).fetchone()[0]
+    db.commit()
+    return count
+
+def test_a_running_import_is_not_claimed_again(db, make_user, tmp_path):
+    user_id = make_user()
+    import_id = results_app.create_import(db, user_id, 'a.csv',
+                                          write_import(tmp_path, student_rows(2)))
+    assert results_app.claim_import(db, import_id)['status'] == 'running'
+    assert results_app.run_import(db, import_id) is None
+    assert result_count(db, user_id) == 0
+
+def test_a_completed_import_is_not_run_again(db, make_user, tmp_path):
+    user_id = make_user()
+    import_id = results_app.create_import(db, user_id, 'a.csv',
+                                          write_import(tmp_path, student_rows(2)))
+    assert results_app.run_import(db, import_id)['status'] == 'completed'
+    assert results_app.run_import(db, import_id) is None
+    assert result_count(db, user_id) == 2
+
+def test_a_stale_running_import_can_be_taken_over(db, make_user, tmp_path):
+    user_id = make_user()
+    import_id = results_app.create_import(db, user_id, 'a.csv',
+                                          write_import(tmp_path, student_rows(2)))
+    results_app.claim_import(db, import_id)
+    db.execute("UPDATE imports SET updated_at = '2000-01-01 00:00:00' WHERE id = ?", (import_id,))
+    db.commit()
+    assert results_app.run_import(db, import_id)['status'] == 'completed'
+
+def test_a_batch_behind_the_committed_progress_is_rolled_back(db, make_user, tmp_path):
+    user_id = make_user()
+    import_id = results_app.create_import(db, user_id, 'a.csv',
+                                          write_import(tmp_path, student_rows(2)))
+    batch = [(dict(student_name='Late', year=2024), [('Maths', 50, 100)])]
+    results_app.flush_import_batch(db, user_id, import_id, 0, 3, batch, [])
+    with pytest.raises(results_app.ImportSuperseded):
+        results_app.flush_import_batch(db, user_id, import_id, 0, 3, batch, [])
+    assert result_count(db, user_id) == 1
+    assert import_row(db, import_id)['last_line'] == 3
+
+def test_consecutive_rows_of_one_result_are_grouped(tmp_path):
+    path = write_import(tmp_path, [
+        'Ann,CBSE,Final,S,10,2024,Maths,50,100',
+        'Ann,CBSE,Final,S,10,2024,Science,60,100',
+        'Ann,CBSE,Mid Term,S,10,2024,Maths,70,100',
+        'Ben,CBSE,Final,S,10,2024,Maths,80,100',
+    ])
+    groups = list(results_app.group_import_rows(results_app.read_import_rows(path)))
+    assert [[line for line, _ in group] for group in groups] == [[2, 3], [4], [5]]
+
+@pytest.mark.parametrize('row, message', [
+    (',CBSE,Final,S,10,2024,Maths,50,100', 'Student name is required.'),
+    ('Ann,CBSE,Final,S,10,20x,Maths,50,100', "Invalid year: '20x'"),
+    ('Ann,CBSE,Final,S,10,2024,Maths,x,100', 'Obtained and total marks must be numbers.'),
+    ('Ann,CBSE,Final,S,10,2024,Maths,nan,100', 'Obtained and total marks must be numbers.'),
+    ('Ann,CBSE,Final,S,10,2024,Maths,50', 'Obtained and total marks must be numbers.'),
+    ('Ann,CBSE,Final,S,10,2024,,50,100', 'Subject name is required.'),
+    ('Ann,CBSE,Final,S,10,2024,Maths,50,0', 'Total marks must be greater than zero.'),
+    ('Ann,CBSE,Final,S,10,2024,Maths,110,100', 'Obtained marks must be between 0 and total.'),
+])
+def test_row_errors_skip_the_result(db, make_user, tmp_path, row, message):
+    user_id = make_user()
+    import_id = results_app.create_import(db, user_id, 'a.csv', write_import(tmp_path, [
+        row, 'Ben,CBSE,Final,S,10,2024,Maths,80,100']))
+    job = results_app.run_import(db, import_id)
+    assert (job['status'], job['results_imported'], job['error_count']) == ('completed', 1, 1)
+    errors = db.execute('SELECT line, message FROM import_errors WHERE import_id = ?',
+                        (import_id,)).fetchall()
+    assert [tuple(error) for error in errors] == [(2, message)]
+
+def test_a_failed_import_resumes_after_the_last_batch(db, make_user, tmp_path, monkeypatch):
+    user_id = make_user()
+    import_id = results_app.create_import(db, user_id, 'a.csv',
+                                          write_import(tmp_path, student_rows(10)))
+    monkeypatch.setattr(results_app, 'IMPORT_BATCH_SIZE', 3)
+    flush, calls = results_app.flush_import_batch, []
+
+    def failing_flush(*args):
+        calls.append(args)
+        if len(calls) == 3:
+            raise RuntimeError('disk full')
+        return flush(*args)
+
+    monkeypatch.setattr(results_app, 'flush_import_batch', failing_flush)
+    with pytest.raises(RuntimeError):
+        results_app.run_import(db, import_id)
+    job = import_row(db, import_id)
+    assert (job['status'], job['last_line'], job['results_imported']) == ('failed', 13, 6)
+
+    monkeypatch.setattr(results_app, 'flush_import_batch', flush)
+    job = results_app.run_import(db, import_id)
+    assert (job['status'], job['results_imported']) == ('completed', 10)
+    names = db.execute('SELECT COUNT(DISTINCT student_name) FROM results WHERE user_id = ?',
+                       (user_id,)).fetchone()[0]
+    assert result_count(db, user_id) == names == 10
+
+def test_uploads_are_imported_by_a_queued_job(db, client):
+    csv_data = (HEADER + '\n'.join(student_rows(3))).encode()
+    response = client.post('/import', data={'file': (io.BytesIO(csv_data), 'a.csv')})
+    import_id = int(response.headers['Location'].rsplit('/', 1)[-1])
+    assert client.get(f'/import/{import_id}?format=json').get_json()['status'] == 'pending'
+
+    run_queued_jobs(db)
+    job = client.get(f'/import/{import_id}?format=json').get_json()
+    assert (job['status'], job['results_imported']) == ('completed', 3)
+    assert result_count(db, client.user_id) == 3
+    assert not os.listdir(results_app.IMPORT_FOLDER)
+
+def test_resume_queues_a_failed_import_once(db, client, tmp_path):
+    import_id = results_app.create_import(db, client.user_id, 'a.csv',
+                                          write_import(tmp_path, student_rows(2)))
+    db.execute("UPDATE imports SET status = 'failed' WHERE id = ?", (import_id,))
+    db.commit()
+    client.post(f'/import/{import_id}/resume')
+    client.post(f'/import/{import_id}/resume')  # already queued: ignored
+    queued = db.execute("SELECT COUNT(*) FROM jobs WHERE kind = 'import_results' "
+                        "AND status = 'queued' AND payload = ?",
+                        (f'{{"import_id": {import_id}}}',)).fetchone()[0]
+    assert queued == 1
+    run_queued_jobs(db)
+    assert import_row(db, import_id)['status'] == 'completed'
+    assert result_count(db, client.user_id) == 2
@@ -0,0 +1,120 @@
+"""Job queue: claims, leases, worker-guarded updates and exports."""
+import time
+
+import pytest
+
+from conftest import add_result, results_app, run_queued_jobs
+
+@results_app.job_handler('test_progress')
+def progress_job(db, job, payload, progress):
+    progress(1, 2)
+    return {'worker': job['worker']}
+
+@pytest.fixture
+def queue(db):
+    """An otherwise empty queue: leftovers of other tests are failed first."""
+    db.execute("UPDATE jobs SET status = 'failed' WHERE status IN ('queued', 'running')")
+    db.commit()
+    return db
+
+def job_row(db, job_id):
+    row = db.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+    db.commit()
+    return row
+
+def expire_lease(db, job_id):
+    db.execute('UPDATE jobs SET heartbeat_at = ? WHERE id = ?',
+               (time.time() - results_app.JOB_LEASE - 1, job_id))
+    db.commit()
+
+def test_claim_marks_the_job_running(queue, make_user):
+    job_id = results_app.enqueue_job(queue, 'test_progress', {}, make_user())
+    job = results_app.claim_job(queue, 'worker-a')
+    assert (job['id'], job['status'], job['worker'], job['attempts']) == \
+        (job_id, 'running', 'worker-a', 1)
+    assert results_app.claim_job(queue, 'worker-b') is None
+
+def test_expired_lease_is_claimed_again(queue, make_user):
+    job_id = results_app.enqueue_job(queue, 'test_progress', {}, make_user())
+    results_app.claim_job(queue, 'worker-a')
+    expire_lease(queue, job_id)
+    job = results_app.claim_job(queue, 'worker-b')
+    assert (job['id'], job['worker'], job['attempts']) == (job_id, 'worker-b', 2)
+
+def test_expired_lease_without_attempts_left_fails(queue, make_user):
+    job_id = results_app.enqueue_job(queue, 'test_progress', {}, make_user())
+    queue.execute('UPDATE jobs SET max_attempts = 1 WHERE id = ?', (job_id,))
+    queue.commit()
+    results_app.claim_job(queue, 'worker-a')
+    expire_lease(queue, job_id)
+    assert results_app.claim_job(queue, 'worker-b') is None
+    job = job_row(queue, job_id)
+    assert job['status'] == 'failed' and 'worker-a' in job['error']
+
+def test_updates_of_a_worker_that_lost_the_job_are_ignored(queue, make_user):
+    job_id = results_app.enqueue_job(queue, 'test_progress', {}, make_user())
+    stale = results_app.claim_job(queue, 'worker-a')
+    expire_lease(queue, job_id)
+    current = results_app.claim_job(queue, 'worker-b')
+
+    results_app.run_job(queue, stale)
+    job = job_row(queue, job_id)
+    assert (job['status'], job['worker'], job['progress']) == ('running', 'worker-b', 0)
+
+    results_app.run_job(queue, current)
+    job = job_row(queue, job_id)
+    assert (job['status'], job['progress'], job['total']) == ('completed', 1, 2)
+    assert '"worker-b"' in job['result']
+
+@pytest.mark.parametrize('subjects, rows', [('', 3), ('joined', 3), ('long', 6)])
+def test_export_progress_counts_csv_rows(queue, make_user, subjects, rows):
+    user_id = make_user()
+    for i in range(3):
+        add_result(queue, user_id, name=f'Student {i}')
+    job_id = results_app.enqueue_job(queue, 'export_csv', {'subjects': subjects}, user_id)
+    results_app.run_job(queue, results_app.claim_job(queue, 'worker-a'))
+    job = job_row(queue, job_id)
+    assert job['status'] == 'completed'
+    assert job['progress'] == job['total'] == rows
+
+def test_a_small_export_is_streamed(queue, client, monkeypatch):
+    monkeypatch.setattr(results_app, 'EXPORT_INLINE_MAX_RESULTS', 3)
+    for i in range(3):
+        add_result(queue, client.user_id, name=f'Student {i}')
+    response = client.get('/export/csv')
+    assert response.status_code == 200 and response.mimetype == 'text/csv'
+    assert len(response.get_data(as_text=True).splitlines()) == 4
+    assert results_app.claim_job(queue, 'worker-a') is None
+
+def test_a_large_export_is_written_by_a_job(queue, client, monkeypatch):
+    monkeypatch.setattr(results_app, 'EXPORT_INLINE_MAX_RESULTS', 2)
+    for i in range(3):
+        add_result(queue, client.user_id, name=f'Student {i}')
+    response = client.get('/export/csv?subjects=long')
+    assert response.status_code == 302
+    status_url = response.headers['Location']
+    page = client.get(status_url).get_data(as_text=True)
+    assert 'queued' in page and 'Download CSV' not in page
+
+    run_queued_jobs(queue)
+    page = client.get(status_url).get_data(as_text=True)
+    assert 'Download CSV' in page
+    job_id = int(status_url.rsplit('/', 1)[1])
+    download = client.get(f'/api/v1/jobs/{job_id}/download')
+    assert len(download.get_data(as_text=True).splitlines()) == 7  # header, one row per subject
+
+def test_another_users_export_is_not_shown(queue, client, make_user):
+    job_id = results_app.enqueue_job(queue, 'export_csv', {'subjects': ''}, make_user())
+    response = client.get(f'/export/csv/{job_id}')
+    assert response.status_code == 302 and response.headers['Location'].endswith('/dashboard')
+
+@pytest.mark.parametrize('params', [{'board': ['CBSE']}, {'year': {'gte': 2019}},
+                                    {'year': 2019.5}, {'class_name': True}])
+def test_delete_filters_must_be_strings_or_integers(client, params):
+    response = client.post('/api/v1/jobs', json={'kind': 'delete_results', 'params': params})
+    assert response.status_code == 422
+
+def test_delete_job_is_queued_with_valid_filters(client):
+    response = client.post('/api/v1/jobs', json={'kind': 'delete_results',
+                                                  'params': {'board': 'CBSE', 'year': 2019}})
+    assert response.status_code == 202
@@ -0,0 +1,27 @@
+"""Page cache: ETags follow the build, Last-Modified never hides a write."""
+import time
+
+from conftest import add_result, results_app
+
+def test_a_new_build_changes_the_etag(client, monkeypatch):
+    client.get('/dashboard')  # shows the login flash, which is never cached
+    etag = client.get('/dashboard').headers['ETag']
+    assert client.get('/dashboard', headers={'If-None-Match': etag}).status_code == 304
+    monkeypatch.setattr(results_app, 'BUILD_ID', 'next-deploy')
+    response = client.get('/dashboard', headers={'If-None-Match': etag})
+    assert response.status_code == 200 and response.headers['ETag'] != etag
+
+def test_last_modified_waits_for_the_second_of_the_last_write(db, client):
+    client.get('/dashboard')
+    add_result(db, client.user_id)
+    assert 'Last-Modified' not in client.get('/dashboard').headers
+
+    db.execute('UPDATE cache_versions SET updated_at = ? WHERE user_id = ?',
+               (time.time() - 5, client.user_id))
+    db.commit()
+    last_modified = client.get('/dashboard').headers['Last-Modified']
+    assert client.get('/dashboard', headers={'If-Modified-Since': last_modified}).status_code == 304
+
+    add_result(db, client.user_id, name='Later')
+    response = client.get('/dashboard', headers={'If-Modified-Since': last_modified})
+    assert response.status_code == 200 and 'Later' in response.get_data(as_text=True)
@@ -0,0 +1,79 @@
+"""Concurrent writes on PostgreSQL; skipped unless DATABASE_URL names one."""
+import threading
+
+import pytest
+
+from conftest import add_result, result_fields, results_app
+
+pytestmark = pytest.mark.skipif(results_app.db_backend.name != 'postgresql',
+                                reason='needs DATABASE_URL=postgresql://...')
+
+@pytest.fixture
+def other_db():
+    conn = results_app.db_pool.acquire()
+    yield conn
+    conn.rollback()
+    results_app.db_pool.release(conn)
+
+def save_in_thread(user_id):
+    """Start a thread saving a result for `user_id` on its own connection."""
+    def run():
+        conn = results_app.db_pool.acquire()
+        try:
+            add_result(conn, user_id)
+        finally:
+            results_app.db_pool.release(conn)
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+def test_writes_of_different_users_do_not_wait(db, make_user):
+    first, second = make_user(), make_user()
+    with results_app.write_transaction(db, first):
+        results_app.write_result(db, first, result_fields(), [('Maths', 50, 100)])
+        thread = save_in_thread(second)
+        thread.join(5)
+        assert not thread.is_alive()
+    assert db.execute('SELECT COUNT(*) FROM results WHERE user_id = ?',
+                      (second,)).fetchone()[0] == 1
+
+def test_writes_of_one_user_are_serialized(db, make_user):
+    user_id = make_user()
+    with results_app.write_transaction(db, user_id):
+        thread = save_in_thread(user_id)
+        thread.join(0.5)
+        assert thread.is_alive()
+    thread.join(5)
+    assert not thread.is_alive()
+
+def test_concurrent_saves_keep_statistics_exact(db, make_user):
+    users = [make_user() for _ in range(3)]
+    threads = [save_in_thread(user_id) for user_id in users * 5]
+    for thread in threads:
+        thread.join(30)
+    for user_id in users:
+        stats = db.execute('SELECT result_count, percentage_sum FROM user_stats '
+                           'WHERE user_id = ?', (user_id,)).fetchone()
+        assert (stats['result_count'], stats['percentage_sum']) == (5, 300)
+
+def test_one_worker_claims_each_job(db, make_user):
+    user_id = make_user()
+    ids = {results_app.enqueue_job(db, 'noop', {}, user_id) for _ in range(10)}
+    claimed, lock = [], threading.Lock()
+
+    def claim(worker):
+        conn = results_app.db_pool.acquire()
+        try:
+            while (job := results_app.claim_job(conn, worker)) is not None:
+                with lock:
+                    claimed.append(job['id'])
+        finally:
+            results_app.db_pool.release(conn)
+
+    threads = [threading.Thread(target=claim, args=(f'test:{i}',)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    mine = [job_id for job_id in claimed if job_id in ids]
+    assert sorted(mine) == sorted(ids)
@@ -0,0 +1,21 @@
+"""check-query-plans: the hot queries, as the routes build them, use indexes."""
+import pytest
+
+from conftest import results_app
+
+pytestmark = pytest.mark.skipif(results_app.db_backend.name != 'sqlite',
+                                reason='reads SQLite query plans')
+
+def test_every_hot_query_uses_an_index(db):
+    assert results_app.check_query_plans(db) == {}
+
+def test_a_route_query_change_is_checked(db, monkeypatch):
+    monkeypatch.setattr(results_app, 'export_query', lambda user_id, subjects_mode, archives=(): (
+        'SELECT * FROM results WHERE user_id = ? ORDER BY student_name', (user_id,)))
+    problems = results_app.check_query_plans(db)
+    assert set(problems) == {'export_csv', 'export_csv_subjects'}
+    assert any('TEMP B-TREE' in line for line in problems['export_csv'])
+
+def test_the_command_reports_success():
+    result = results_app.app.test_cli_runner().invoke(args=['check-query-plans'])
+    assert result.exit_code == 0 and 'hot queries use an index' in result.output
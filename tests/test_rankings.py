@@ -0,0 +1,105 @@
+"""Cohort rankings: journal replay, cohort moves and per-user locking."""
+import threading
+
+import pytest
+
+from conftest import add_result, result_fields, results_app
+
+KEY = ('CBSE', 2024, '10', None)
+OTHER_KEY = ('ICSE', 2024, '10', None)
+
+@pytest.fixture
+def engine():
+    return results_app.RankingEngine(8)
+
+def ranks(engine, db, user_id, wanted):
+    answer = engine.ranks(db, user_id, wanted)
+    db.commit()
+    return answer
+
+def assert_current(engine, db, user_id, wanted):
+    """The cached engine answers as one loading everything afresh."""
+    fresh = results_app.RankingEngine(8)
+    assert ranks(engine, db, user_id, wanted) == ranks(fresh, db, user_id, wanted)
+
+def result_row(db, result_id):
+    row = db.execute('SELECT * FROM results WHERE id = ?', (result_id,)).fetchone()
+    db.commit()
+    return row
+
+def edit(db, user_id, result_id, obtained, board='CBSE'):
+    fields = dict(result_fields(), board=board)
+    results_app.save_result(db, user_id, fields, [('Maths', obtained, 100), ('Science', obtained, 100)],
+                            existing=result_row(db, result_id))
+
+def cached(engine, user_id, key):
+    return engine._users[user_id][1].get(key)
+
+@pytest.fixture
+def cohort(db, make_user):
+    user_id = make_user()
+    ids = [add_result(db, user_id, f'Student {score}', score) for score in (60, 70, 80)]
+    return user_id, ids
+
+def test_an_edit_is_replayed_into_the_cached_cohort(engine, db, cohort):
+    user_id, ids = cohort
+    assert ranks(engine, db, user_id, [(KEY, 70)])[0]['rank'] == 2
+    before = cached(engine, user_id, KEY)
+    edit(db, user_id, ids[2], 50)
+    assert ranks(engine, db, user_id, [(KEY, 70)])[0]['rank'] == 1
+    assert cached(engine, user_id, KEY) is before
+    assert_current(engine, db, user_id, [(KEY, 50), (KEY, 70)])
+
+def test_a_result_moving_cohort_leaves_one_and_joins_the_other(engine, db, cohort):
+    user_id, ids = cohort
+    add_result(db, user_id, 'Other', 90)
+    edit(db, user_id, ids[-1], 90, board='ICSE')  # the new ICSE cohort: 90
+    wanted = [(KEY, 70), (OTHER_KEY, 90)]
+    ranks(engine, db, user_id, wanted)
+    edit(db, user_id, ids[0], 60, board='ICSE')
+    answer = ranks(engine, db, user_id, wanted)
+    assert [rank['size'] for rank in answer] == [2, 2]
+    assert_current(engine, db, user_id, wanted)
+
+def test_a_deleted_result_leaves_its_cohort(engine, db, cohort):
+    user_id, ids = cohort
+    ranks(engine, db, user_id, [(KEY, 70)])
+    with results_app.write_transaction(db, user_id):
+        db.execute('DELETE FROM results WHERE id = ?', (ids[2],))
+    assert ranks(engine, db, user_id, [(KEY, 70)])[0] == {'rank': 1, 'size': 2,
+                                                          'percentile': 75.0}
+    assert_current(engine, db, user_id, [(KEY, 70)])
+
+def test_a_pruned_journal_reloads_the_cohort(engine, db, cohort):
+    user_id, ids = cohort
+    ranks(engine, db, user_id, [(KEY, 70)])
+    before = cached(engine, user_id, KEY)
+    edit(db, user_id, ids[0], 65)
+    edit(db, user_id, ids[1], 75)
+    # as the prune trigger would: only the newest entry is left
+    db.execute('DELETE FROM score_changes WHERE id < (SELECT MAX(id) FROM score_changes)')
+    db.commit()
+    assert ranks(engine, db, user_id, [(KEY, 75)])[0]['rank'] == 2
+    assert cached(engine, user_id, KEY) is not before
+    assert_current(engine, db, user_id, [(KEY, 65), (KEY, 75), (KEY, 80)])
+
+def test_a_busy_user_does_not_hold_up_others(engine, db, cohort, make_user):
+    user_id, _ = cohort
+    other = make_user()
+    add_result(db, other, 'Other', 55)
+    ranks(engine, db, user_id, [(KEY, 70)])
+    answers = []
+
+    def rank_other():
+        conn = results_app.db_pool.acquire()
+        try:
+            answers.append(ranks(engine, conn, other, [(KEY, 55)]))
+        finally:
+            results_app.db_pool.release(conn)
+
+    with engine._users[user_id][0]:  # as while waiting for the user's write
+        thread = threading.Thread(target=rank_other)
+        thread.start()
+        thread.join(5)
+        assert not thread.is_alive()
+    assert answers[0][0]['size'] == 1
@@ -0,0 +1,21 @@
+"""Sign-in rate limits behind a trusted reverse proxy."""
+import pytest
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from conftest import results_app
+
+@pytest.fixture
+def proxied_client(monkeypatch):
+    monkeypatch.setattr(results_app, 'RATE_LIMIT_ENABLED', True)
+    monkeypatch.setitem(results_app.rate_limiters, 'ip', results_app.RateLimiter(2, 0.01))
+    monkeypatch.setattr(results_app.app, 'wsgi_app', ProxyFix(results_app.app.wsgi_app, x_for=1))
+    return results_app.app.test_client()
+
+def login_from(client, ip, attempt):
+    return client.post('/login', data={'email': f'nobody{attempt}@example.com',
+                                       'password': 'wrong'},
+                       headers={'X-Forwarded-For': ip}).status_code
+
+def test_clients_behind_the_proxy_get_their_own_buckets(proxied_client):
+    assert [login_from(proxied_client, '203.0.113.1', i) for i in range(3)][-1] == 429
+    assert login_from(proxied_client, '203.0.113.2', 3) != 429
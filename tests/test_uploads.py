@@ -0,0 +1,64 @@
+"""Content-addressed uploads: processing never rewrites a blob in place."""
+import hashlib
+import io
+import os
+
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+
+from conftest import result_fields, results_app
+
+def jpeg_with_exif():
+    exif = Image.Exif()
+    exif[0x010F] = 'Test Camera'  # Make
+    buf = io.BytesIO()
+    Image.new('RGB', (640, 480), 'red').save(buf, 'JPEG', exif=exif)
+    return buf.getvalue()
+
+def blob_digest(path):
+    with open(os.path.join('static', path), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def add_with_image(db, user_id, data):
+    image_path = results_app.save_upload(db, FileStorage(io.BytesIO(data)), 'jpg')
+    result_id = results_app.save_result(db, user_id, result_fields(), [('Maths', 50, 100)],
+                                        image_path)
+    return result_id, image_path
+
+def result_row(db, result_id):
+    row = db.execute('SELECT * FROM results WHERE id = ?', (result_id,)).fetchone()
+    db.commit()
+    return row
+
+def test_processing_stores_the_clean_copy_as_a_new_blob(db, make_user):
+    user_id = make_user()
+    result_id, original = add_with_image(db, user_id, jpeg_with_exif())
+    results_app.process_image(db, user_id, result_id, original)
+
+    row = result_row(db, result_id)
+    assert row['image_path'] != original and row['image_variants']
+    for path in (original, row['image_path']):
+        assert blob_digest(path) == os.path.basename(path).split('.')[0]
+    with Image.open(os.path.join('static', row['image_path'])) as im:
+        assert not im.getexif()
+
+def test_gc_removes_the_original_once_processed(db, make_user):
+    user_id = make_user()
+    result_id, original = add_with_image(db, user_id, jpeg_with_exif())
+    results_app.process_image(db, user_id, result_id, original)
+    processed = result_row(db, result_id)['image_path']
+
+    results_app.collect_garbage(db, grace=-1)
+    assert not os.path.exists(os.path.join('static', original))
+    assert os.path.exists(os.path.join('static', processed))
+
+def test_edit_read_before_processing_keeps_the_processed_image(db, make_user):
+    user_id = make_user()
+    result_id, original = add_with_image(db, user_id, jpeg_with_exif())
+    stale = result_row(db, result_id)
+    results_app.process_image(db, user_id, result_id, original)
+
+    results_app.save_result(db, user_id, result_fields('Renamed'), [('Maths', 60, 100)],
+                            stale['image_path'], existing=stale)
+    row = result_row(db, result_id)
+    assert row['image_path'] != original and row['image_variants']